@@ -2,14 +2,18 @@
 
 import os
 import sys
+from pathlib import Path
 
-import numpy as np
+# 直接以脚本运行时，将项目根目录加入模块搜索路径（须在导入项目模块之前）
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if __package__ is None:
+    sys.path.insert(0, str(PROJECT_ROOT))
 
-from waveform_analyzer import WaveformAnalyzer
-from waveform_generator import WaveformGenerator
-from waveform_visualizer import WaveformVisualizer
+import numpy as np  # noqa: E402
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from waveform_analyzer import WaveformAnalyzer  # noqa: E402
+from waveform_generator import WaveformGenerator  # noqa: E402
+from waveform_visualizer import WaveformVisualizer  # noqa: E402
 
 # 创建结果目录
 results_dir = "basic_example_results"
@@ -24,26 +28,31 @@ visualizer = WaveformVisualizer({"results_dir": results_dir})
 # 设置波形参数
 width = 5e-3  # 5ms
 t_display = np.linspace(0, width * 3, 10000)  # 显示3倍波宽
-t_full = np.linspace(
-    0, analyzer.config["t_max"], analyzer.config["n_samples"]
-)  # 用于频谱分析的完整时间序列
+t_full = analyzer.t  # 用于频谱分析的完整时间序列，复用分析器的时间轴
 
 # 生成微分脉冲波
 differential = generator.differential_pulse(t_display, width)
 differential_full = generator.differential_pulse(t_full, width)
 
-# 分析波形
-spectrum = analyzer.compute_spectrum(differential_full)
-dominant_freq = analyzer.find_dominant_frequency(differential_full)
-bandwidth = analyzer.compute_bandwidth(differential_full)
+# 分析波形：FFT只计算一次，归一化频谱由未归一化频谱推导后传给各分析方法
+spectrum_raw = analyzer.compute_spectrum(differential_full, normalize=False)
+peak = np.max(spectrum_raw)
+spectrum_norm = spectrum_raw / peak if peak > 0 else spectrum_raw
+dominant_freq = analyzer.find_dominant_frequency(
+    differential_full, spectrum=spectrum_raw
+)
+bandwidth = analyzer.compute_bandwidth(differential_full, spectrum=spectrum_norm)
 stats = analyzer.compute_statistics(differential_full)
+peaks = analyzer.find_multiple_peaks(differential_full, spectrum=spectrum_norm)
+# 绘图和导出用的频谱去掉直流分量，与 freq_positive 一一对应
+spectrum = analyzer.spectrum_positive(spectrum=spectrum_norm)
 
 # 可视化波形和频谱
 visualizer.plot_waveform_and_spectrum(
     t_display,
     differential,
     analyzer.freq_positive,
-    spectrum[1 : len(analyzer.freq_positive) + 1],
+    spectrum,
     width,
     f"Half-Sine Wave (Width: {width*1e3:.1f}ms)",
     "differential_analysis.png",
@@ -55,7 +64,7 @@ visualizer.export_waveform_data(
     t_display,
     differential,
     analyzer.freq_positive,
-    spectrum[1 : len(analyzer.freq_positive) + 1],
+    spectrum,
     "differential_data",
 )
 
@@ -66,7 +75,7 @@ wave_info = {
     "stats": stats,
     "dominant_freq": dominant_freq,
     "bandwidth": (*bandwidth, 0.5),
-    "peaks": analyzer.find_multiple_peaks(differential_full),
+    "peaks": peaks,
 }
 
 visualizer.generate_report(wave_info, "differential_report.txt")
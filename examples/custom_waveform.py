@@ -2,14 +2,18 @@
 
 import os
 import sys
+from pathlib import Path
 
-import numpy as np
+# 直接以脚本运行时，将项目根目录加入模块搜索路径（须在导入项目模块之前）
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if __package__ is None:
+    sys.path.insert(0, str(PROJECT_ROOT))
 
-from waveform_analyzer import WaveformAnalyzer
-from waveform_generator import WaveformGenerator
-from waveform_visualizer import WaveformVisualizer
+import numpy as np  # noqa: E402
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from waveform_analyzer import WaveformAnalyzer  # noqa: E402
+from waveform_generator import WaveformGenerator  # noqa: E402
+from waveform_visualizer import WaveformVisualizer  # noqa: E402
 
 # 创建结果目录
 results_dir = "custom_waveform_results"
@@ -26,29 +30,34 @@ visualizer = WaveformVisualizer({"results_dir": results_dir})
 def sawtooth_wave(t, width):
     """锯齿波."""
     wave = np.zeros_like(t)
-    mask = (0 <= t) & (t <= width)
-    wave[mask] = t[mask] / width
+    # 时间向量单调递增，[0, width] 对应一段连续切片，直接写入输出数组
+    start, end = np.searchsorted(t, 0), np.searchsorted(t, width, side="right")
+    np.divide(t[start:end], width, out=wave[start:end])
     return wave
 
 
 def chirp_wave(t, width):
     """啁啾信号."""
     wave = np.zeros_like(t)
-    mask = (0 <= t) & (t <= width)
+    start, end = np.searchsorted(t, 0), np.searchsorted(t, width, side="right")
     f0 = 10  # 起始频率
     f1 = 1000  # 结束频率
-    wave[mask] = np.sin(
-        2 * np.pi * (f0 * t[mask] + (f1 - f0) * t[mask] ** 2 / (2 * width))
-    )
+
+    # 相位 2π·t·(f0 + (f1 - f0)·t / (2·width)) 在输出切片上原地计算
+    t_on = t[start:end]
+    phase = wave[start:end]
+    np.multiply(t_on, (f1 - f0) / (2 * width), out=phase)
+    phase += f0
+    phase *= t_on
+    phase *= 2 * np.pi
+    np.sin(phase, out=phase)
     return wave
 
 
 # 设置波形参数
 width = 5e-3  # 5ms
 t_display = np.linspace(0, width * 3, 10000)  # 显示3倍波宽
-t_full = np.linspace(
-    0, analyzer.config["t_max"], analyzer.config["n_samples"]
-)  # 用于频谱分析的完整时间序列
+t_full = analyzer.t  # 用于频谱分析的完整时间序列，复用分析器的时间轴
 
 # 生成自定义波形
 sawtooth = sawtooth_wave(t_display, width)
@@ -61,16 +70,18 @@ chirp_full = chirp_wave(t_full, width)
 custom_sawtooth = generator.custom_waveform(t_display, width, sawtooth_wave)
 custom_chirp = generator.custom_waveform(t_display, width, chirp_wave)
 
-# 分析波形
-sawtooth_spectrum = analyzer.compute_spectrum(sawtooth_full)
-chirp_spectrum = analyzer.compute_spectrum(chirp_full)
+# 分析波形：两个波形的频谱通过一次批量 rfft 计算
+# （频谱去掉直流分量，与 freq_positive 一一对应）
+sawtooth_spectrum, chirp_spectrum = analyzer.spectrum_positive(
+    spectrum=analyzer.compute_spectrum_batch(np.stack([sawtooth_full, chirp_full]))
+)
 
 # 可视化波形和频谱
 visualizer.plot_waveform_and_spectrum(
     t_display,
     sawtooth,
     analyzer.freq_positive,
-    sawtooth_spectrum[1 : len(analyzer.freq_positive) + 1],
+    sawtooth_spectrum,
     width,
     f"Sawtooth Wave (Width: {width*1e3:.1f}ms)",
     "sawtooth_analysis.png",
@@ -80,7 +91,7 @@ visualizer.plot_waveform_and_spectrum(
     t_display,
     chirp,
     analyzer.freq_positive,
-    chirp_spectrum[1 : len(analyzer.freq_positive) + 1],
+    chirp_spectrum,
     width,
     f"Chirp Wave (Width: {width*1e3:.1f}ms)",
     "chirp_analysis.png",
@@ -99,8 +110,8 @@ visualizer.plot_multiple_waveforms(
 visualizer.plot_multiple_spectra(
     analyzer.freq_positive,
     [
-        sawtooth_spectrum[1 : len(analyzer.freq_positive) + 1],
-        chirp_spectrum[1 : len(analyzer.freq_positive) + 1],
+        sawtooth_spectrum,
+        chirp_spectrum,
     ],
     ["Sawtooth Wave", "Chirp Wave"],
     f"Custom Spectrum Comparison (Width: {width*1e3:.1f}ms)",
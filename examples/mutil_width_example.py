@@ -2,18 +2,29 @@
 
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 
-import matplotlib.pyplot as plt
-import numpy as np
-import pandas as pd
-from matplotlib.gridspec import GridSpec
+# 直接以脚本运行时，将项目根目录加入模块搜索路径（须在导入项目模块之前）
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if __package__ is None:
+    sys.path.insert(0, str(PROJECT_ROOT))
 
-from waveform_analyzer import WaveformAnalyzer
-from waveform_generator import WaveformGenerator
-from waveform_visualizer import WaveformVisualizer
+import matplotlib  # noqa: E402
+
+# 子进程中没有图形界面，统一使用非交互式的Agg后端
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+from matplotlib.collections import LineCollection  # noqa: E402
+from matplotlib.gridspec import GridSpec  # noqa: E402
+from matplotlib.lines import Line2D  # noqa: E402
+
+from waveform_analyzer import WaveformAnalyzer  # noqa: E402
+from waveform_generator import WaveformGenerator  # noqa: E402
+from waveform_visualizer import WaveformVisualizer  # noqa: E402
 
-# 导入必要的模块
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # 创建结果目录
 results_dir = "multi_width_analysis_results"
 if not os.path.exists(results_dir):
@@ -27,54 +38,53 @@ visualizer = WaveformVisualizer({"results_dir": results_dir})
 # 设置要分析的不同宽度值（单位：秒）
 widths = [1e-3, 2e-3, 5e-3, 10e-3, 20e-3]  # 1ms到20ms的不同宽度
 
-# 创建汇总比较图
-fig = plt.figure(figsize=(15, 10))
-gs = GridSpec(2, 2, figure=fig)
-
-# 时域波形比较
-ax1 = fig.add_subplot(gs[0, 0])
-# 频谱比较
-ax2 = fig.add_subplot(gs[0, 1])
-# 主频与宽度关系
-ax3 = fig.add_subplot(gs[1, 0])
-# 带宽与宽度关系
-ax4 = fig.add_subplot(gs[1, 1])
-
-# 存储结果数据
-dominant_freqs = []
-bandwidths = []
-peak_values = []
-
-# 循环处理每个宽度
-for width in widths:
+# 所有宽度共用同一完整时间序列
+t_full = analyzer.t
+
+
+def process_width(width, differential_full, spectrum_raw):
+    """
+    分析单个宽度的微分脉冲并保存图像、数据和报告.
+
+    参数:
+    width (float): 波宽，单位秒
+    differential_full (ndarray): 完整时间序列上的波形
+    spectrum_raw (ndarray): 批量计算的未归一化频谱
+
+    返回:
+    dict: 主频、带宽、峰值以及用于汇总比较图的曲线
+    """
     print(f"处理宽度为 {width*1e3:.1f}ms 的波形...")
 
-    # 设置时间轴
-    t_display = np.linspace(0, width * 4, 10000)  # 显示4倍波宽以便观察
-    t_full = np.linspace(0, analyzer.config["t_max"], analyzer.config["n_samples"])
+    # 显示4倍波宽以便观察，直接截取完整波形的前段，无需重新生成
+    n_display = np.searchsorted(t_full, width * 4, side="right")
+    t_display = t_full[:n_display]
+    differential = differential_full[:n_display]
 
-    # 生成微分脉冲波
-    differential = generator.differential_pulse(t_display, width)
-    differential_full = generator.differential_pulse(t_full, width)
+    # 绘图只需约2000个点，完整分辨率的数据仍用于导出
+    stride = max(1, len(t_display) // 2000)
 
-    # 分析波形
-    spectrum = analyzer.compute_spectrum(differential_full)
-    dominant_freq = analyzer.find_dominant_frequency(differential_full)
-    bandwidth = analyzer.compute_bandwidth(differential_full)
+    # 分析波形：直接复用批量计算的频谱，归一化频谱由未归一化频谱推导
+    spectrum_peak = np.max(spectrum_raw)
+    spectrum_norm = spectrum_raw / spectrum_peak if spectrum_peak > 0 else spectrum_raw
+    dominant_freq = analyzer.find_dominant_frequency(
+        differential_full, spectrum=spectrum_raw
+    )
+    bandwidth = analyzer.compute_bandwidth(differential_full, spectrum=spectrum_norm)
     stats = analyzer.compute_statistics(differential_full)
-    peaks = analyzer.find_multiple_peaks(differential_full)
+    peaks = analyzer.find_multiple_peaks(differential_full, spectrum=spectrum_norm)
+    # 绘图和导出共用同一个去掉直流分量的频谱视图
+    spectrum = analyzer.spectrum_positive(spectrum=spectrum_norm)
 
-    # 存储结果
-    dominant_freqs.append(dominant_freq[0])
-    bandwidths.append(bandwidth[0])
-    peak_values.append(np.max(np.abs(differential)))
+    # 峰值只计算一次，后续归一化直接复用
+    peak = np.abs(differential).max()
 
     # 可视化单个波形和频谱
     visualizer.plot_waveform_and_spectrum(
-        t_display,
-        differential,
+        t_display[::stride],
+        differential[::stride],
         analyzer.freq_positive,
-        spectrum[1 : len(analyzer.freq_positive) + 1],
+        spectrum,
         width,
         f"Differential pulse (width: {width*1e3:.1f}ms)",
         f"differential_width_{width*1e3:.1f}ms.png",
@@ -86,7 +96,7 @@ for width in widths:
         t_display,
         differential,
         analyzer.freq_positive,
-        spectrum[1 : len(analyzer.freq_positive) + 1],
+        spectrum,
         f"differential_data_width_{width*1e3:.1f}ms",
     )
 
@@ -104,58 +114,125 @@ for width in widths:
         wave_info, f"differential_report_width_{width*1e3:.1f}ms.txt"
     )
 
-    # 添加到比较图
-    # 归一化时域波形以便比较
-    normalized_wave = differential / np.max(np.abs(differential))
-    ax1.plot(t_display * 1000, normalized_wave, label=f"{width*1e3:.1f}ms")
-
+    # 归一化时域波形以便比较（只归一化用于绘图的抽样点）
+    normalized_wave = differential[::stride] / peak
     # 频谱比较（使用对数刻度以便观察）
-    spec_to_plot = spectrum[1 : len(analyzer.freq_positive) + 1]
-    spec_to_plot = spec_to_plot / np.max(spec_to_plot)  # 归一化频谱
-    ax2.semilogy(analyzer.freq_positive, spec_to_plot, label=f"{width*1e3:.1f}ms")
-
-# 绘制主频和带宽与宽度的关系
-ax3.plot(np.array(widths) * 1000, dominant_freqs, "o-", linewidth=2)
-ax3.set_xlabel("Wave width (ms)")
-ax3.set_ylabel("Dominant frequency (Hz)")
-ax3.set_title("Relationship between Dominant Frequency and Wave Width")
-ax3.grid(True)
-
-ax4.plot(np.array(widths) * 1000, bandwidths, "o-", linewidth=2)
-ax4.set_xlabel("Wave width (ms)")
-ax4.set_ylabel("Bandwidth (Hz)")
-ax4.set_title("Relationship between Bandwidth and Wave Width")
-ax4.grid(True)
-
-# 设置比较图的标签
-ax1.set_xlabel("Time (ms)")
-ax1.set_ylabel("Normalized Amplitude")
-ax1.set_title("Time Domain Comparison of Differential Pulses with Different Widths")
-ax1.legend()
-ax1.grid(True)
-
-ax2.set_xlabel("Frequency (Hz)")
-ax2.set_ylabel("Normalized Amplitude (Log Scale)")
-ax2.set_title(
-    "Frequency Spectrum Comparison of Differential Pulses with Different Widths"
-)
-ax2.legend()
-ax2.grid(True)
-
-# 保存比较图
-plt.tight_layout()
-plt.savefig(os.path.join(results_dir, "width_comparison_summary.png"), dpi=300)
-
-# 创建表格数据
-table_data = {
-    "宽度 (ms)": [w * 1000 for w in widths],
-    "主频 (Hz)": dominant_freqs,
-    "带宽 (Hz)": bandwidths,
-    "峰值": peak_values,
-}
-
-# 导出表格数据到CSV
-df = pd.DataFrame(table_data)
-df.to_csv(os.path.join(results_dir, "width_comparison_data.csv"), index=False)
-
-print(f"分析完成。所有结果保存在 {results_dir} 目录中。")
+    spec_to_plot = spectrum / np.max(spectrum)  # 归一化频谱
+
+    return {
+        "dominant_freq": dominant_freq[0],
+        "bandwidth": bandwidth[0],
+        "peak": peak,
+        "time_segment": np.column_stack((t_display[::stride] * 1000, normalized_wave)),
+        "spectrum_segment": np.column_stack((analyzer.freq_positive, spec_to_plot)),
+    }
+
+
+def main():
+    """并行处理所有宽度并生成汇总比较图和表格."""
+    # 所有宽度共用同一完整时间序列，批量生成波形并一次性计算全部未归一化频谱，
+    # 各进程直接复用，不再重复计算FFT
+    differential_batch = generator.differential_pulse_batch(t_full, widths)
+    spectrum_batch = analyzer.compute_spectrum_batch(
+        differential_batch, normalize=False
+    )
+
+    # 各宽度的分析、绘图和文件写入互不依赖，分配到多个进程并行执行
+    with ProcessPoolExecutor(max_workers=len(widths)) as executor:
+        results = list(
+            executor.map(process_width, widths, differential_batch, spectrum_batch)
+        )
+
+    # 长曲线分块光栅化，降低Agg渲染开销
+    plt.rcParams["agg.path.chunksize"] = 10000
+
+    dominant_freqs = [result["dominant_freq"] for result in results]
+    bandwidths = [result["bandwidth"] for result in results]
+    peak_values = [result["peak"] for result in results]
+
+    # 创建汇总比较图
+    fig = plt.figure(figsize=(15, 10))
+    gs = GridSpec(2, 2, figure=fig)
+
+    # 时域波形比较
+    ax1 = fig.add_subplot(gs[0, 0])
+    # 频谱比较
+    ax2 = fig.add_subplot(gs[0, 1])
+    # 主频与宽度关系
+    ax3 = fig.add_subplot(gs[1, 0])
+    # 带宽与宽度关系
+    ax4 = fig.add_subplot(gs[1, 1])
+
+    # 每个子图只创建一个LineCollection，代替逐条创建Line2D
+    colors = [f"C{i}" for i in range(len(widths))]
+    legend_handles = [
+        Line2D([], [], color=color, label=f"{width*1e3:.1f}ms")
+        for color, width in zip(colors, widths)
+    ]
+
+    time_segments = [result["time_segment"] for result in results]
+    ax1.add_collection(LineCollection(time_segments, colors=colors))
+    ax1.autoscale_view()
+
+    spectrum_segments = [result["spectrum_segment"] for result in results]
+    ax2.set_yscale("log")
+    ax2.add_collection(LineCollection(spectrum_segments, colors=colors))
+    ax2.autoscale_view()
+
+    # 绘制主频和带宽与宽度的关系
+    ax3.plot(np.array(widths) * 1000, dominant_freqs, "o-", linewidth=2)
+    ax3.set_xlabel("Wave width (ms)")
+    ax3.set_ylabel("Dominant frequency (Hz)")
+    ax3.set_title("Relationship between Dominant Frequency and Wave Width")
+    ax3.grid(True)
+
+    ax4.plot(np.array(widths) * 1000, bandwidths, "o-", linewidth=2)
+    ax4.set_xlabel("Wave width (ms)")
+    ax4.set_ylabel("Bandwidth (Hz)")
+    ax4.set_title("Relationship between Bandwidth and Wave Width")
+    ax4.grid(True)
+
+    # 设置比较图的标签
+    ax1.set_xlabel("Time (ms)")
+    ax1.set_ylabel("Normalized Amplitude")
+    ax1.set_title("Time Domain Comparison of Differential Pulses with Different Widths")
+    ax1.legend(handles=legend_handles)
+    ax1.grid(True)
+
+    ax2.set_xlabel("Frequency (Hz)")
+    ax2.set_ylabel("Normalized Amplitude (Log Scale)")
+    ax2.set_title(
+        "Frequency Spectrum Comparison of Differential Pulses with Different Widths"
+    )
+    ax2.legend(handles=legend_handles)
+    ax2.grid(True)
+
+    # 保存比较图：汇总图用150dpi已足够清晰，并使用最快的PNG压缩等级
+    plt.tight_layout()
+    plt.savefig(
+        os.path.join(results_dir, "width_comparison_summary.png"),
+        dpi=150,
+        pil_kwargs={"compress_level": 1},
+    )
+
+    # 创建表格数据
+    table_data = np.column_stack(
+        (np.array(widths) * 1000, dominant_freqs, bandwidths, peak_values)
+    )
+
+    # 导出表格数据到CSV
+    np.savetxt(
+        os.path.join(results_dir, "width_comparison_data.csv"),
+        table_data,
+        delimiter=",",
+        fmt="%.10g",
+        header="宽度 (ms),主频 (Hz),带宽 (Hz),峰值",
+        comments="",
+        encoding="utf-8",
+    )
+
+    print(f"分析完成。所有结果保存在 {results_dir} 目录中。")
+
+
+if __name__ == "__main__":
+    main()
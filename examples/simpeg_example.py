@@ -2,14 +2,18 @@
 
 import os
 import sys
+from pathlib import Path
 
-import numpy as np
+# 直接以脚本运行时，将项目根目录加入模块搜索路径（须在导入项目模块之前）
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if __package__ is None:
+    sys.path.insert(0, str(PROJECT_ROOT))
 
-from waveform_analyzer import WaveformAnalyzer
-from waveform_generator import WaveformGenerator
-from waveform_visualizer import WaveformVisualizer
+import numpy as np  # noqa: E402
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from waveform_analyzer import WaveformAnalyzer  # noqa: E402
+from waveform_generator import WaveformGenerator  # noqa: E402
+from waveform_visualizer import WaveformVisualizer  # noqa: E402
 
 # 创建结果目录
 results_dir = "simpeg_example_results"
@@ -29,9 +33,7 @@ if not generator.has_simpeg:
 # 设置波形参数
 width = 5e-3  # 5ms
 t_display = np.linspace(0, width * 3, 10000)  # 显示3倍波宽
-t_full = np.linspace(
-    0, analyzer.config["t_max"], analyzer.config["n_samples"]
-)  # 用于频谱分析的完整时间序列
+t_full = analyzer.t  # 用于频谱分析的完整时间序列，复用分析器的时间轴
 
 # 生成SimPEG波形
 trapezoid = generator.simpeg_trapezoid(t_display, width)
@@ -43,17 +45,20 @@ diff_pulse_full = generator.simpeg_differential_pulse(t_full, width)
 step_off = generator.simpeg_step_off(t_display, width)
 step_off_full = generator.simpeg_step_off(t_full, width)
 
-# 分析波形
-trapezoid_spectrum = analyzer.compute_spectrum(trapezoid_full)
-diff_pulse_spectrum = analyzer.compute_spectrum(diff_pulse_full)
-step_off_spectrum = analyzer.compute_spectrum(step_off_full)
+# 分析波形：三个波形的频谱通过一次批量 rfft 计算
+# （频谱去掉直流分量，与 freq_positive 一一对应）
+trapezoid_spectrum, diff_pulse_spectrum, step_off_spectrum = analyzer.spectrum_positive(
+    spectrum=analyzer.compute_spectrum_batch(
+        np.stack([trapezoid_full, diff_pulse_full, step_off_full])
+    )
+)
 
 # 可视化波形和频谱
 visualizer.plot_waveform_and_spectrum(
     t_display,
     trapezoid,
     analyzer.freq_positive,
-    trapezoid_spectrum[1 : len(analyzer.freq_positive) + 1],
+    trapezoid_spectrum,
     width,
     f"SimPEG Trapezoid Wave (Width: {width*1e3:.1f}ms)",
     "simpeg_trapezoid_analysis.png",
@@ -63,7 +68,7 @@ visualizer.plot_waveform_and_spectrum(
     t_display,
     diff_pulse,
     analyzer.freq_positive,
-    diff_pulse_spectrum[1 : len(analyzer.freq_positive) + 1],
+    diff_pulse_spectrum,
     width,
     f"SimPEG Differential Pulse (Width: {width*1e3:.1f}ms)",
     "simpeg_diff_pulse_analysis.png",
@@ -73,7 +78,7 @@ visualizer.plot_waveform_and_spectrum(
     t_display,
     step_off,
     analyzer.freq_positive,
-    step_off_spectrum[1 : len(analyzer.freq_positive) + 1],
+    step_off_spectrum,
     width,
     f"SimPEG Step-Off Wave (Width: {width*1e3:.1f}ms)",
     "simpeg_step_off_analysis.png",
@@ -92,9 +97,9 @@ visualizer.plot_multiple_waveforms(
 visualizer.plot_multiple_spectra(
     analyzer.freq_positive,
     [
-        trapezoid_spectrum[1 : len(analyzer.freq_positive) + 1],
-        diff_pulse_spectrum[1 : len(analyzer.freq_positive) + 1],
-        step_off_spectrum[1 : len(analyzer.freq_positive) + 1],
+        trapezoid_spectrum,
+        diff_pulse_spectrum,
+        step_off_spectrum,
     ],
     ["Trapezoid Wave", "Differential Pulse", "Step-Off Wave"],
     f"SimPEG Spectrum Comparison (Width: {width*1e3:.1f}ms)",
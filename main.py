@@ -4,6 +4,18 @@ import argparse
 
 from waveform_manager import WaveformManager
 
+# 波形类型表: 波形类型 -> (生成器方法名, 显示名称, 是否需要SimPEG)
+WAVE_TYPES = {
+    "half_sine": ("half_sine_wave", "Half-Sine Wave", False),
+    "differential": ("differential_pulse", "Differential Pulse", False),
+    "square": ("square_wave", "Square Wave", False),
+    "triangle": ("triangle_wave", "Triangle Wave", False),
+    "gaussian": ("gaussian_pulse", "Gaussian Pulse", False),
+    "trapezoid": ("simpeg_trapezoid", "SimPEG Trapezoid", True),
+    "simpeg_diff": ("simpeg_differential_pulse", "SimPEG Differential Pulse", True),
+    "step_off": ("simpeg_step_off", "SimPEG Step-Off", True),
+}
+
 
 def parse_args():
     """解析命令行参数."""
@@ -21,16 +33,7 @@ def parse_args():
         "--wave_type",
         type=str,
         default="half_sine",
-        choices=[
-            "half_sine",
-            "differential",
-            "square",
-            "triangle",
-            "gaussian",
-            "trapezoid",
-            "simpeg_diff",
-            "step_off",
-        ],
+        choices=list(WAVE_TYPES),
         help="波形类型",
     )
 
@@ -40,45 +43,31 @@ def parse_args():
         "--results_dir", type=str, default="waveform_results", help="结果保存目录"
     )
 
+    parser.add_argument(
+        "--dpi", type=int, default=300, help="图像DPI，只需数据和报告时可调低以加快绘图"
+    )
+
     return parser.parse_args()
 
 
 def get_wave_func(manager, wave_type):
     """获取波形函数."""
-    wave_funcs = {
-        "half_sine": manager.generator.half_sine_wave,
-        "differential": manager.generator.differential_pulse,
-        "square": manager.generator.square_wave,
-        "triangle": manager.generator.triangle_wave,
-        "gaussian": manager.generator.gaussian_pulse,
-    }
-
-    if manager.generator.has_simpeg:
-        wave_funcs.update(
-            {
-                "trapezoid": manager.generator.simpeg_trapezoid,
-                "simpeg_diff": manager.generator.simpeg_differential_pulse,
-                "step_off": manager.generator.simpeg_step_off,
-            }
-        )
-
-    return wave_funcs.get(wave_type)
+    if wave_type not in WAVE_TYPES:
+        return None
+
+    func_name, _, requires_simpeg = WAVE_TYPES[wave_type]
+    if requires_simpeg and not manager.generator.has_simpeg:
+        return None
+
+    return getattr(manager.generator, func_name)
 
 
 def get_wave_name(wave_type):
     """获取波形名称."""
-    wave_names = {
-        "half_sine": "Half-Sine Wave",
-        "differential": "Differential Pulse",
-        "square": "Square Wave",
-        "triangle": "Triangle Wave",
-        "gaussian": "Gaussian Pulse",
-        "trapezoid": "SimPEG Trapezoid",
-        "simpeg_diff": "SimPEG Differential Pulse",
-        "step_off": "SimPEG Step-Off",
-    }
+    if wave_type not in WAVE_TYPES:
+        return None
 
-    return wave_names.get(wave_type)
+    return WAVE_TYPES[wave_type][1]
 
 
 def main():
@@ -89,6 +78,7 @@ def main():
     manager = WaveformManager(
         {
             "results_dir": args.results_dir,
+            "dpi": args.dpi,
         }
     )
 
@@ -114,10 +104,13 @@ def main():
         wave_funcs = []
         wave_names = []
 
-        # 添加内置波形
-        wave_types = ["half_sine", "differential", "square", "triangle", "gaussian"]
-        if manager.generator.has_simpeg:
-            wave_types.extend(["trapezoid", "simpeg_diff", "step_off"])
+        # 添加内置波形，未安装SimPEG时跳过SimPEG波形
+        has_simpeg = manager.generator.has_simpeg
+        wave_types = [
+            wave_type
+            for wave_type, (_, _, requires_simpeg) in WAVE_TYPES.items()
+            if has_simpeg or not requires_simpeg
+        ]
 
         for wave_type in wave_types:
             wave_func = get_wave_func(manager, wave_type)
@@ -131,6 +124,9 @@ def main():
         manager.compare_waveforms(wave_funcs, wave_names, args.width)
         print(f"比较完成。结果保存在 {args.results_dir} 目录中。")
 
+    # 关闭可视化器复用的图形
+    manager.close()
+
 
 if __name__ == "__main__":
     main()
@@ -38,6 +38,87 @@ class TestWaveformAnalyzer(unittest.TestCase):
         # 检查峰值频率是否接近预期
         self.assertAlmostEqual(peak_freq, freq, delta=1.0)
 
+    def test_compute_spectrum_fast_length(self):
+        """测试FFT长度补零到快速长度."""
+        # 素数采样点数会被补零到 next_fast_len
+        analyzer = WaveformAnalyzer({"n_samples": 10007})
+        wave = self.generator.half_sine_wave(analyzer.t, self.width)
+
+        spectrum = analyzer.compute_spectrum(wave)
+
+        # 检查FFT长度和频谱长度
+        self.assertGreaterEqual(analyzer.n_fft, 10007)
+        self.assertEqual(len(spectrum), len(analyzer.freq))
+        self.assertEqual(len(analyzer.t), 10007)
+
+    def test_float32_precision(self):
+        """测试单精度流程与双精度结果一致."""
+        analyzer64 = WaveformAnalyzer({"dtype": np.float64})
+        wave32 = self.generator.half_sine_wave(self.analyzer.t, self.width)
+        wave64 = self.generator.half_sine_wave(analyzer64.t, self.width)
+
+        # 检查 dtype 在生成和频谱计算中保持不变
+        self.assertEqual(wave32.dtype, np.float32)
+        self.assertEqual(self.analyzer.compute_spectrum(wave32).dtype, np.float32)
+
+        # 检查主频和统计特性与双精度一致
+        self.assertEqual(
+            self.analyzer.find_dominant_frequency(wave32)[0],
+            analyzer64.find_dominant_frequency(wave64)[0],
+        )
+        stats32 = self.analyzer.compute_statistics(wave32)
+        stats64 = analyzer64.compute_statistics(wave64)
+        for key in ["mean", "std", "rms", "energy"]:
+            self.assertAlmostEqual(stats32[key], stats64[key], delta=1e-6)
+
+    def test_compute_spectrum_dtype(self):
+        """测试频谱精度跟随输入波形，与批量计算一致."""
+        wave = self.generator.half_sine_wave(self.analyzer.t, self.width)
+        wave64 = wave.astype(np.float64)
+
+        # 双精度波形不会被降为单精度缓冲区的类型
+        spectrum = self.analyzer.compute_spectrum(wave64)
+        self.assertEqual(spectrum.dtype, np.float64)
+        batch = self.analyzer.compute_spectrum_batch(wave64[np.newaxis])
+        np.testing.assert_array_almost_equal(spectrum, batch[0])
+
+        # 单精度波形的频谱与批量计算一致
+        np.testing.assert_array_almost_equal(
+            self.analyzer.compute_spectrum(wave),
+            self.analyzer.compute_spectrum_batch(wave[np.newaxis])[0],
+        )
+
+    def test_spectrum_positive(self):
+        """测试去掉直流分量的频谱."""
+        wave = self.generator.half_sine_wave(self.analyzer.t, self.width)
+        spectrum = self.analyzer.compute_spectrum(wave)
+
+        # 检查与 freq_positive 对齐，且为原频谱的视图
+        spectrum_positive = self.analyzer.spectrum_positive(spectrum=spectrum)
+        self.assertEqual(len(spectrum_positive), len(self.analyzer.freq_positive))
+        self.assertTrue(np.shares_memory(spectrum_positive, spectrum))
+        np.testing.assert_array_equal(
+            self.analyzer.spectrum_positive(wave), spectrum_positive
+        )
+
+    def test_compute_spectrum_batch(self):
+        """测试批量频谱计算."""
+        waves = np.stack(
+            [
+                self.generator.half_sine_wave(self.analyzer.t, self.width),
+                self.generator.square_wave(self.analyzer.t, self.width),
+            ]
+        )
+
+        # 批量计算频谱
+        spectra = self.analyzer.compute_spectrum_batch(waves)
+
+        # 检查每一行是否与单独计算的结果一致
+        self.assertEqual(spectra.shape, (2, self.analyzer.n_freq))
+        for wave, spectrum in zip(waves, spectra):
+            expected = self.analyzer.compute_spectrum(wave)
+            np.testing.assert_array_almost_equal(spectrum, expected)
+
     def test_find_dominant_frequency(self):
         """测试主频查找."""
         # 生成正弦波
@@ -51,11 +132,44 @@ class TestWaveformAnalyzer(unittest.TestCase):
         # 检查主频是否接近预期
         self.assertAlmostEqual(dominant_freq, freq, delta=1.0)
 
+    def test_dominant_frequency_alignment(self):
+        """测试主频与频谱峰值所在的频点对齐."""
+        # 频率恰好落在某个频点上的正弦波
+        freq = self.analyzer.freq_positive[49]
+        wave = np.sin(2 * np.pi * freq * self.analyzer.t)
+
+        dominant_freq, _ = self.analyzer.find_dominant_frequency(wave)
+        peak_freqs, _ = self.analyzer.find_multiple_peaks(wave)
+
+        self.assertEqual(dominant_freq, freq)
+        self.assertEqual(peak_freqs[0], freq)
+
+    def test_find_multiple_peaks(self):
+        """测试多峰查找."""
+        # 生成双频正弦波
+        t = np.linspace(0, 1, 10000)
+        wave = np.sin(2 * np.pi * 100 * t) + 0.5 * np.sin(2 * np.pi * 300 * t)
+
+        # 查找峰值
+        peak_freqs, peak_values = self.analyzer.find_multiple_peaks(
+            wave, n_peaks=2, distance=50
+        )
+
+        # 检查峰值按幅值降序排列且频率接近预期
+        self.assertEqual(len(peak_freqs), 2)
+        self.assertGreater(peak_values[0], peak_values[1])
+        self.assertAlmostEqual(peak_freqs[0], 100, delta=1.0)
+        self.assertAlmostEqual(peak_freqs[1], 300, delta=1.0)
+
     def test_compute_bandwidth(self):
         """测试带宽计算."""
         # 生成半正弦波
         wave = self.generator.half_sine_wave(self.analyzer.t, self.width)
 
+        # 频谱长度应与 rfft 频率轴一致
+        spectrum = self.analyzer.compute_spectrum(wave)
+        self.assertEqual(len(spectrum), len(self.analyzer.freq))
+
         # 计算带宽
         low_freq, high_freq, bandwidth = self.analyzer.compute_bandwidth(wave)
 
@@ -63,6 +177,25 @@ class TestWaveformAnalyzer(unittest.TestCase):
         self.assertGreater(bandwidth, 0)
         self.assertLess(low_freq, high_freq)
 
+    def test_precomputed_spectrum(self):
+        """测试传入预先计算的频谱与内部计算结果一致."""
+        wave = self.generator.differential_pulse(self.analyzer.t, self.width)
+        spectrum_raw = self.analyzer.compute_spectrum(wave, normalize=False)
+        spectrum = self.analyzer.compute_spectrum(wave, normalize=True)
+
+        self.assertEqual(
+            self.analyzer.find_dominant_frequency(wave, spectrum=spectrum_raw),
+            self.analyzer.find_dominant_frequency(wave),
+        )
+        self.assertEqual(
+            self.analyzer.compute_bandwidth(wave, spectrum=spectrum),
+            self.analyzer.compute_bandwidth(wave),
+        )
+        peak_freqs, _ = self.analyzer.find_multiple_peaks(wave, spectrum=spectrum)
+        np.testing.assert_array_equal(
+            peak_freqs, self.analyzer.find_multiple_peaks(wave)[0]
+        )
+
     def test_compute_energy(self):
         """测试能量计算."""
         # 生成方波
@@ -74,6 +207,15 @@ class TestWaveformAnalyzer(unittest.TestCase):
         # 检查能量是否大于0
         self.assertGreater(energy, 0)
 
+        # 多维波形按全部采样点计算能量
+        waves = np.ones((3, 4))
+        self.assertAlmostEqual(
+            self.analyzer.compute_energy(waves), 12 * self.analyzer.dt
+        )
+        self.assertAlmostEqual(
+            self.analyzer.compute_energy(waves[:, :3]), 9 * self.analyzer.dt
+        )
+
     def test_compute_statistics(self):
         """测试统计特性计算."""
         # 生成三角波
@@ -96,6 +238,25 @@ class TestWaveformAnalyzer(unittest.TestCase):
         self.assertGreaterEqual(stats["min"], 0.0)
         self.assertAlmostEqual(stats["peak_to_peak"], 1.0, delta=1e-4)
 
+    def test_compute_statistics_numba(self):
+        """测试Numba内核与NumPy实现的统计特性一致."""
+        if not self.analyzer.has_numba:
+            self.skipTest("Numba not installed")
+
+        numpy_analyzer = WaveformAnalyzer()
+        numpy_analyzer.has_numba = False
+        wave = self.generator.differential_pulse(self.analyzer.t, self.width)
+
+        stats = self.analyzer.compute_statistics(wave)
+        expected = numpy_analyzer.compute_statistics(wave)
+        for key, value in expected.items():
+            self.assertAlmostEqual(stats[key], value, delta=1e-9)
+
+        # 内核未编译的浮点类型回退到NumPy实现
+        for dtype in [np.float16, np.longdouble]:
+            stats = self.analyzer.compute_statistics(np.ones(10, dtype=dtype))
+            self.assertAlmostEqual(stats["mean"], 1.0)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -44,6 +44,19 @@ class TestWaveformGenerator(unittest.TestCase):
         self.assertAlmostEqual(np.max(wave), 1.0)
         self.assertAlmostEqual(np.min(wave), -1.0)
 
+    def test_differential_pulse_batch(self):
+        """测试批量差分脉冲."""
+        widths = [0.005, 0.01, 0.02]
+        waves = self.generator.differential_pulse_batch(self.t, widths)
+
+        # 检查波形形状
+        self.assertEqual(waves.shape, (len(widths), len(self.t)))
+
+        # 检查每一行是否与单独生成的结果一致
+        for wave, width in zip(waves, widths):
+            expected = self.generator.differential_pulse(self.t, width)
+            np.testing.assert_array_almost_equal(wave, expected)
+
     def test_square_wave(self):
         """测试方波."""
         wave = self.generator.square_wave(self.t, self.width)
@@ -80,6 +93,119 @@ class TestWaveformGenerator(unittest.TestCase):
         # 检查波形最大值
         self.assertAlmostEqual(np.max(wave), 1.0, delta=1e-2)
 
+        # 检查距中心6sigma（即一个波宽）之外为0
+        self.assertEqual(np.sum(wave[self.t >= self.width * 1.5]), 0)
+
+    def test_integer_time(self):
+        """测试整数时间向量得到浮点波形."""
+        t = np.arange(10)
+
+        for name in ["half_sine_wave", "triangle_wave", "gaussian_pulse"]:
+            wave = getattr(self.generator, name)(t, 5)
+            expected = getattr(self.generator, name)(t.astype(np.float64), 5)
+            self.assertEqual(wave.dtype, np.float64)
+            np.testing.assert_allclose(wave, expected, atol=1e-12)
+
+    def test_multidimensional_time(self):
+        """测试多维时间向量与一维结果一致."""
+        t = self.t[np.newaxis, :]
+
+        for name in [
+            "half_sine_wave",
+            "differential_pulse",
+            "square_wave",
+            "triangle_wave",
+            "gaussian_pulse",
+        ]:
+            wave = getattr(self.generator, name)(t, self.width)
+            expected = getattr(self.generator, name)(self.t, self.width)
+            self.assertEqual(wave.shape, t.shape)
+            np.testing.assert_allclose(wave[0], expected, atol=1e-12)
+
+    def test_unsorted_time(self):
+        """测试未排序的时间向量与排序后的结果一致."""
+        order = np.random.default_rng(0).permutation(len(self.t))
+        t = self.t[order]
+
+        for name in [
+            "half_sine_wave",
+            "differential_pulse",
+            "square_wave",
+            "triangle_wave",
+            "gaussian_pulse",
+        ]:
+            wave = getattr(self.generator, name)(t, self.width)
+            expected = getattr(self.generator, name)(self.t, self.width)
+            np.testing.assert_allclose(wave, expected[order], atol=1e-12)
+
+        # 逆序的短时间向量
+        wave = self.generator.square_wave(np.array([0.02, 0.005, 0.001, -0.001]), 0.01)
+        np.testing.assert_array_equal(wave, [0, 1, 1, 0])
+
+    def test_numba_kernels(self):
+        """测试Numba内核与NumPy实现结果一致."""
+        if not self.generator.has_numba:
+            self.skipTest("Numba not installed")
+
+        numpy_generator = WaveformGenerator()
+        numpy_generator.has_numba = False
+        t = np.linspace(-0.01, 0.05, 6001)
+
+        for name in [
+            "differential_pulse",
+            "triangle_wave",
+        ]:
+            wave = getattr(self.generator, name)(t, self.width)
+            expected = getattr(numpy_generator, name)(t, self.width)
+            np.testing.assert_allclose(wave, expected, atol=1e-12)
+
+        # 内核未编译的浮点类型回退到NumPy实现
+        for dtype in [np.float16, np.longdouble]:
+            for name in ["differential_pulse", "triangle_wave"]:
+                wave = getattr(self.generator, name)(t.astype(dtype), self.width)
+                self.assertEqual(wave.shape, t.shape)
+
+    def test_simpeg_waveforms(self):
+        """测试SimPEG波形与逐点eval结果一致."""
+        if not self.generator.has_simpeg:
+            self.skipTest("SimPEG not installed")
+
+        import simpeg.electromagnetics.time_domain as tdem
+
+        time_delay = self.generator.config["time_delay"]
+        trapezoid = tdem.sources.TrapezoidWaveform(
+            ramp_on=np.array([0, time_delay]),
+            ramp_off=np.array([self.width - time_delay, self.width]),
+        )
+        step_off = tdem.sources.StepOffWaveform(off_time=self.width)
+
+        wave = self.generator.simpeg_trapezoid(self.t, self.width)
+        expected = [trapezoid.eval(time) for time in self.t]
+        np.testing.assert_array_almost_equal(wave, expected)
+
+        wave = self.generator.simpeg_step_off(self.t, self.width)
+        expected = [step_off.eval(time) for time in self.t]
+        np.testing.assert_array_equal(wave, expected)
+
+        # 差分脉冲：正向梯形后接平移一个波宽的反向梯形
+        w = self.width
+        diff_pulse = tdem.sources.PiecewiseLinearWaveform(
+            [
+                0,
+                time_delay,
+                w - time_delay,
+                w,
+                w + time_delay,
+                2 * w - time_delay,
+                2 * w,
+            ],
+            [0, 1, 1, 0, -1, -1, 0],
+        )
+        wave = self.generator.simpeg_differential_pulse(self.t, self.width)
+        expected = [diff_pulse.eval(time) for time in self.t]
+        np.testing.assert_array_almost_equal(wave, expected)
+        self.assertEqual(np.sum(wave[self.t >= 2 * self.width]), 0)
+
     def test_custom_waveform(self):
         """测试自定义波形."""
 
@@ -0,0 +1,37 @@
+"""测试工具函数."""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+from waveform_utils import aligned_empty, aligned_zeros
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestWaveformUtils(unittest.TestCase):
+    """测试工具函数."""
+
+    def test_aligned_empty(self):
+        """测试对齐数组分配."""
+        for dtype in [np.float32, np.float64]:
+            array = aligned_empty((3, 1001), dtype)
+
+            # 检查形状、类型和首地址对齐
+            self.assertEqual(array.shape, (3, 1001))
+            self.assertEqual(array.dtype, dtype)
+            self.assertEqual(array.ctypes.data % 64, 0)
+            self.assertTrue(array.flags["C_CONTIGUOUS"])
+
+    def test_aligned_zeros(self):
+        """测试对齐全零数组分配."""
+        array = aligned_zeros(1000, np.float32, align=32)
+
+        self.assertEqual(array.ctypes.data % 32, 0)
+        self.assertEqual(np.count_nonzero(array), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
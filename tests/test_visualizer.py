@@ -33,17 +33,16 @@ class TestWaveformVisualizer(unittest.TestCase):
         self.wave = self.generator.half_sine_wave(self.t, self.width)
 
         # 计算频谱
-        t_full = np.linspace(0, 1, 10000)
-        wave_full = self.generator.half_sine_wave(t_full, self.width)
+        wave_full = self.generator.half_sine_wave(self.analyzer.t, self.width)
         self.spectrum = self.analyzer.compute_spectrum(wave_full)
-        self.freq = self.analyzer.freq_positive
 
-        # 确保使用相同长度的频率和频谱数据
+        # rfft 频谱与 freq 一一对应，去掉直流分量后与 freq_positive 对齐
         self.freq = self.analyzer.freq_positive
-        self.spectrum_positive = self.spectrum[: len(self.freq)]  # 截取与freq长度相同的部分
+        self.spectrum_positive = self.spectrum[self.analyzer.positive_slice]
 
     def tearDown(self):
         """测试后清理."""
+        self.visualizer.close()
         if os.path.exists(self.test_dir):
             shutil.rmtree(self.test_dir)
 
@@ -57,6 +56,16 @@ class TestWaveformVisualizer(unittest.TestCase):
         # 检查文件是否存在
         self.assertTrue(os.path.exists(save_path))
 
+    def test_figures_not_tracked_by_pyplot(self):
+        """测试复用的图形不进入pyplot的全局图形管理器."""
+        import matplotlib.pyplot as plt
+
+        self.visualizer.plot_waveform(
+            self.t, self.wave, self.width, "Test Waveform", "test_waveform.png"
+        )
+
+        self.assertEqual(plt.get_fignums(), [])
+
     def test_plot_spectrum(self):
         """测试频谱绘制."""
         filename = "test_spectrum.png"
@@ -3,14 +3,30 @@
 This module provides functionality for waveform analyzer.
 """
 
+import os
+from collections import ChainMap
+from types import MappingProxyType
+
 import numpy as np
-from scipy.fft import fft, fftfreq
+from scipy.fft import next_fast_len, rfft, rfftfreq
 from scipy.signal import find_peaks
 
+from waveform_utils import aligned_empty
+
 
 class WaveformAnalyzer:
     """波形分析器类，用于分析波形特性."""
 
+    # 默认配置（只读，所有实例共享）
+    _DEFAULTS = MappingProxyType(
+        {
+            "t_max": 1.0,
+            "n_samples": 100000,
+            "dtype": np.float32,
+            "fft_workers": -1,
+        }
+    )
+
     def __init__(self, config=None):
         """
         初始化波形分析器.
@@ -19,28 +35,97 @@ class WaveformAnalyzer:
         config (dict): 配置参数字典，可包含以下键:
             - t_max: 最大时间
             - n_samples: 采样点数
+            - dtype: 时间轴和频谱计算使用的浮点类型
+            - fft_workers: FFT并行线程数，负数表示按CPU核心数计（-1为全部核心）
         """
-        # 默认配置
-        default_config = {
-            "t_max": 1.0,
-            "n_samples": 100000,
-        }
-
-        # 更新配置
-        self.config = default_config
-        if config:
-            self.config.update(config)
+        # 用户配置覆盖类级默认配置，默认配置本身不被复制或修改
+        self.config = ChainMap(dict(config or {}), self._DEFAULTS)
 
         # 初始化时间和频率参数
         self._init_time_freq_params()
 
+        # 检查是否安装了pyFFTW，FFTW计划在首次计算频谱时创建
+        self.has_pyfftw = self._check_pyfftw()
+        self._fft_plan = None
+
+        # 检查是否安装了Numba，安装时和与平方和由编译后的内核单次遍历计算
+        self.has_numba = self._check_numba()
+
     def _init_time_freq_params(self):
         """初始化时间和频率参数."""
-        self.t = np.linspace(0, self.config["t_max"], self.config["n_samples"])
-        self.dt = self.t[1] - self.t[0]
-        self.n_freq = self.config["n_samples"] // 2
-        self.freq = fftfreq(self.config["n_samples"], self.dt)[: self.n_freq]
+        # 采样间隔按双精度计算以保证频率轴准确，时间轴本身按配置的精度存储；
+        # 单精度足以表示分析所需的有效位数，并使生成和FFT的内存流量减半
+        t = np.linspace(0, self.config["t_max"], self.config["n_samples"])
+        self.dt = t[1] - t[0]
+        # 时间轴按64字节对齐存储，便于生成波形时的向量化循环
+        self.t = aligned_empty(t.shape, self.config["dtype"])
+        self.t[:] = t
+        # FFT 长度向上取到 next_fast_len，避免大素因子导致的慢速变换；
+        # 时间轴仍为 n_samples 个点，补零只会使频率轴略微加密
+        self.n_fft = next_fast_len(self.config["n_samples"], real=True)
+        # 实数波形只需非负频率部分，共 n_fft//2 + 1 个频点（含直流）
+        self.freq = rfftfreq(self.n_fft, self.dt)
+        self.n_freq = len(self.freq)
         self.freq_positive = self.freq[self.freq > 0]
+        self.n_positive = len(self.freq_positive)
+        # 频谱中与 freq_positive 一一对应的部分（去掉直流分量）
+        self.positive_slice = slice(1, 1 + self.n_positive)
+
+    def _fft_length(self, wave):
+        """返回波形的FFT长度，只有与时间轴等长的波形才补零到 n_fft."""
+        if np.shape(wave)[-1] == self.config["n_samples"]:
+            return self.n_fft
+        return None
+
+    def _check_pyfftw(self):
+        """检查是否安装了pyFFTW."""
+        try:
+            import pyfftw  # noqa: F401
+
+            return True
+        except ImportError:
+            return False
+
+    def _check_numba(self):
+        """检查是否安装了Numba，安装时保存内核模块供统计计算复用."""
+        self._kernels = None
+        try:
+            import waveform_kernels
+        except ImportError:
+            return False
+
+        self._kernels = waveform_kernels
+        return True
+
+    def _fft_threads(self):
+        """将 fft_workers 换算为实际线程数，负数的含义与 scipy.fft 的 workers 相同."""
+        workers = self.config["fft_workers"]
+        if workers < 0:
+            workers = max(os.cpu_count() + 1 + workers, 1)
+        return workers
+
+    def _get_fft_plan(self):
+        """获取与时间轴等长波形的pyFFTW计划，输入输出缓冲区在各次调用间复用."""
+        if self._fft_plan is None:
+            import pyfftw
+
+            dtype = np.dtype(self.config["dtype"])
+            self._fft_in = pyfftw.empty_aligned(self.n_fft, dtype=dtype)
+            self._fft_out = pyfftw.empty_aligned(
+                self.n_fft // 2 + 1, dtype=np.result_type(dtype, np.complex64)
+            )
+            # FFTW_MEASURE 规划需要秒级时间，每个分析器只做少量变换时无法收回，
+            # 因此用 FFTW_ESTIMATE 按启发式规则快速规划
+            self._fft_plan = pyfftw.FFTW(
+                self._fft_in,
+                self._fft_out,
+                flags=("FFTW_ESTIMATE",),
+                threads=self._fft_threads(),
+            )
+            # 补零部分在各次变换间保持为零
+            self._fft_in[:] = 0
+
+        return self._fft_plan
 
     def compute_spectrum(self, wave, normalize=True):
         """
@@ -53,15 +138,83 @@ class WaveformAnalyzer:
         返回:
         ndarray: 频谱幅值
         """
-        spectrum = fft(wave)
-        magnitude = np.abs(spectrum[: self.n_freq]) / self.config["n_samples"]
+        n_samples = self.config["n_samples"]
+        if (
+            self.has_pyfftw
+            and isinstance(wave, np.ndarray)
+            and wave.shape == (n_samples,)
+            and wave.dtype == self.config["dtype"]
+        ):
+            # 时间轴上的波形复用预先规划的FFTW变换和对齐缓冲区；
+            # 只接受与缓冲区同类型的波形，其余类型不做隐式降精度，走scipy.fft
+            plan = self._get_fft_plan()
+            self._fft_in[:n_samples] = wave
+            plan()
+            spectrum = self._fft_out
+        else:
+            # scipy.fft 会按变换长度缓存 FFT 计划，重复调用时无需重新规划；
+            # workers 控制并行线程数，默认使用全部 CPU 核心
+            spectrum = rfft(
+                wave, n=self._fft_length(wave), workers=self.config["fft_workers"]
+            )
+
+        # 幅值缩放均原地进行，np.abs 生成新数组，不会与FFTW输出缓冲区共享内存
+        magnitude = np.abs(spectrum)
+
+        # 归一化会抵消按采样点数的缩放，因此两者只做其一
+        peak = np.max(magnitude) if normalize else 0
+        if peak > 0:
+            magnitude /= peak
+        else:
+            magnitude /= self.config["n_samples"]
+
+        return magnitude
+
+    def spectrum_positive(self, wave=None, normalize=True, spectrum=None):
+        """
+        获取与 freq_positive 一一对应的频谱（去掉直流分量）.
 
-        if normalize and np.max(magnitude) > 0:
-            magnitude = magnitude / np.max(magnitude)
+        参数:
+        wave (ndarray): 波形振幅，传入 spectrum 时可省略
+        normalize (bool): 是否归一化频谱
+        spectrum (ndarray): 预先计算的频谱，单个或批量均可，为None时由wave计算
+
+        返回:
+        ndarray: 频谱幅值，为原频谱的视图，不复制数据
+        """
+        if spectrum is None:
+            spectrum = self.compute_spectrum(wave, normalize=normalize)
+
+        return spectrum[..., self.positive_slice]
+
+    def compute_spectrum_batch(self, waves, normalize=True):
+        """
+        批量计算多个波形的频谱.
+
+        参数:
+        waves (ndarray): 波形振幅，形状为 (波形数, 采样点数)
+        normalize (bool): 是否逐个波形归一化频谱
+
+        返回:
+        ndarray: 频谱幅值，形状为 (波形数, 频点数)
+        """
+        spectrum = rfft(
+            waves,
+            n=self._fft_length(waves),
+            axis=-1,
+            workers=self.config["fft_workers"],
+        )
+        magnitude = np.abs(spectrum)
+
+        if normalize:
+            peak = np.max(magnitude, axis=-1, keepdims=True)
+            np.divide(magnitude, peak, out=magnitude, where=peak > 0)
+        else:
+            magnitude /= self.config["n_samples"]
 
         return magnitude
 
-    def find_dominant_frequency(self, wave, min_freq=1, max_freq=None):
+    def find_dominant_frequency(self, wave, min_freq=1, max_freq=None, spectrum=None):
         """
         查找波形的主频.
 
@@ -69,22 +222,24 @@ class WaveformAnalyzer:
         wave (ndarray): 波形振幅
         min_freq (float): 最小频率限制，单位Hz
         max_freq (float): 最大频率限制，单位Hz
+        spectrum (ndarray): 预先计算的未归一化频谱，为None时由wave计算
 
         返回:
         tuple: (主频, 幅值)
         """
-        spectrum = self.compute_spectrum(wave, normalize=False)
+        if spectrum is None:
+            spectrum = self.compute_spectrum(wave, normalize=False)
 
-        # 确定频率范围
-        min_idx = max(1, np.searchsorted(self.freq_positive, min_freq))
+        # 确定频率范围，索引相对于 freq_positive
+        min_idx = np.searchsorted(self.freq_positive, min_freq)
         if max_freq is None:
-            max_idx = len(self.freq_positive)
+            max_idx = self.n_positive
         else:
             max_idx = np.searchsorted(self.freq_positive, max_freq)
 
-        # 在指定范围内查找峰值
+        # 在指定范围内查找峰值，频谱先去掉直流分量再与 freq_positive 对齐
         freq_range = self.freq_positive[min_idx:max_idx]
-        spectrum_range = spectrum[min_idx : min_idx + len(freq_range)]
+        spectrum_range = spectrum[self.positive_slice][min_idx:max_idx]
 
         if len(freq_range) == 0:
             return (0, 0)
@@ -97,7 +252,15 @@ class WaveformAnalyzer:
         return (dominant_freq, peak_value)
 
     def find_multiple_peaks(
-        self, wave, n_peaks=3, min_freq=1, max_freq=None, height=0.1
+        self,
+        wave,
+        n_peaks=3,
+        min_freq=1,
+        max_freq=None,
+        height=0.1,
+        distance=None,
+        prominence=None,
+        spectrum=None,
     ):
         """
         查找波形的多个频率峰值.
@@ -108,28 +271,34 @@ class WaveformAnalyzer:
         min_freq (float): 最小频率限制，单位Hz
         max_freq (float): 最大频率限制，单位Hz
         height (float): 峰值最小高度（相对于最大值）
+        distance (int): 相邻峰值之间的最小频点间隔，None表示不限制
+        prominence (float): 峰值最小突出度（相对于最大值），None表示不计算突出度
+        spectrum (ndarray): 预先计算的归一化频谱，为None时由wave计算
 
         返回:
         tuple: (峰值频率数组, 对应幅值数组)
         """
-        spectrum = self.compute_spectrum(wave, normalize=True)
+        if spectrum is None:
+            spectrum = self.compute_spectrum(wave, normalize=True)
 
-        # 确定频率范围
-        min_idx = max(1, np.searchsorted(self.freq_positive, min_freq))
+        # 确定频率范围，索引相对于 freq_positive
+        min_idx = np.searchsorted(self.freq_positive, min_freq)
         if max_freq is None:
-            max_idx = len(self.freq_positive)
+            max_idx = self.n_positive
         else:
             max_idx = np.searchsorted(self.freq_positive, max_freq)
 
-        # 在指定范围内查找峰值
+        # 在指定范围内查找峰值，频谱先去掉直流分量再与 freq_positive 对齐
         freq_range = self.freq_positive[min_idx:max_idx]
-        spectrum_range = spectrum[min_idx : min_idx + len(freq_range)]
+        spectrum_range = spectrum[self.positive_slice][min_idx:max_idx]
 
         if len(freq_range) == 0:
             return ([], [])
 
-        # 找到多个峰值
-        peaks, _ = find_peaks(spectrum_range, height=height)
+        # 找到多个峰值，高度和间隔筛选都是O(N)，突出度需额外遍历频谱，按需开启
+        peaks, _ = find_peaks(
+            spectrum_range, height=height, distance=distance, prominence=prominence
+        )
 
         # 按幅值排序
         sorted_indices = np.argsort(spectrum_range[peaks])[::-1][:n_peaks]
@@ -138,21 +307,23 @@ class WaveformAnalyzer:
 
         return (peak_freqs, peak_values)
 
-    def compute_bandwidth(self, wave, threshold=0.8):
+    def compute_bandwidth(self, wave, threshold=0.8, spectrum=None):
         """
         计算波形的带宽（频谱幅值超过阈值的频率范围）.
 
         参数:
         wave (ndarray): 波形振幅
         threshold (float): 阈值，相对于最大幅值
+        spectrum (ndarray): 预先计算的归一化频谱，为None时由wave计算
 
         返回:
         tuple: (最低频率, 最高频率, 带宽)
         """
-        spectrum = self.compute_spectrum(wave, normalize=True)
+        if spectrum is None:
+            spectrum = self.compute_spectrum(wave, normalize=True)
 
         # 找到超过阈值的频率点
-        mask = spectrum[1 : len(self.freq_positive) + 1] >= threshold
+        mask = spectrum[self.positive_slice] >= threshold
 
         if not np.any(mask):
             return (0, 0, 0)
@@ -174,7 +345,9 @@ class WaveformAnalyzer:
         返回:
         float: 波形能量
         """
-        return np.sum(wave**2) * self.dt
+        # 点积由BLAS直接完成乘加累积，不生成平方后的临时数组；
+        # vdot 先展平输入，任意形状的波形都按全部采样点求平方和
+        return float(np.vdot(wave, wave)) * self.dt
 
     def compute_statistics(self, wave):
         """
@@ -186,14 +359,38 @@ class WaveformAnalyzer:
         返回:
         dict: 包含统计特性的字典
         """
+        # 只需求和、平方和、最小值和最大值，其余统计量均由此推导；
+        # 由平方和推导方差存在相消误差，因此均按双精度累加
+        # 内核只针对单精度和双精度数组编译，其余输入走NumPy实现
+        if (
+            self.has_numba
+            and isinstance(wave, np.ndarray)
+            and wave.dtype in (np.float32, np.float64)
+        ):
+            # 和与平方和在同一次遍历中按双精度累加，无需转换整个波形；
+            # 最小值和最大值仍用NumPy的SIMD归约，比逐点比较的循环更快
+            total, total_sq = self._kernels.sum_and_sum_sq(wave.ravel())
+        else:
+            wave = np.asarray(wave, dtype=np.float64)
+            total = np.sum(wave)
+            total_sq = np.vdot(wave, wave)
+
+        n = wave.size
+        wave_min = np.min(wave)
+        wave_max = np.max(wave)
+
+        mean = total / n
+        mean_sq = total_sq / n
+
         stats = {
-            "mean": np.mean(wave),
-            "std": np.std(wave),
-            "min": np.min(wave),
-            "max": np.max(wave),
-            "peak_to_peak": np.max(wave) - np.min(wave),
-            "rms": np.sqrt(np.mean(wave**2)),
-            "energy": self.compute_energy(wave),
+            "mean": mean,
+            "std": np.sqrt(max(mean_sq - mean**2, 0.0)),
+            "min": wave_min,
+            "max": wave_max,
+            "peak_to_peak": wave_max - wave_min,
+            "rms": np.sqrt(mean_sq),
+            # 能量即平方和乘以采样间隔，直接复用平方和
+            "energy": total_sq * self.dt,
         }
 
         return stats
@@ -3,13 +3,25 @@
 This module provides functionality for waveform generator.
 """
 
+from collections import ChainMap
+from types import MappingProxyType
+
 import numpy as np
-import simpeg.electromagnetics.time_domain as tdem
+
+from waveform_utils import aligned_zeros
 
 
 class WaveformGenerator:
     """波形生成器类，用于生成各种波形."""
 
+    # 默认配置（只读，所有实例共享）
+    _DEFAULTS = MappingProxyType(
+        {
+            "time_delay": 1e-5,
+            "pulse_ratio": 0.5,
+        }
+    )
+
     def __init__(self, config=None):
         """
         初始化波形生成器.
@@ -19,27 +31,79 @@ class WaveformGenerator:
             - time_delay: 波形时间延迟
             - pulse_ratio: 脉冲宽度比例
         """
-        # 默认配置
-        default_config = {
-            "time_delay": 1e-5,
-            "pulse_ratio": 0.5,
-        }
-
-        # 更新配置
-        self.config = default_config
-        if config:
-            self.config.update(config)
+        # 用户配置覆盖类级默认配置，默认配置本身不被复制或修改
+        self.config = ChainMap(dict(config or {}), self._DEFAULTS)
 
         # 检查是否安装了SimPEG
         self.has_simpeg = self._check_simpeg()
 
+        # 检查是否安装了Numba，安装时分段波形由编译后的内核生成
+        self.has_numba = self._check_numba()
+
     def _check_simpeg(self):
-        """检查是否安装了SimPEG."""
+        """检查是否安装了SimPEG，安装时保存时间域模块供各SimPEG波形复用."""
+        self._tdem = None
         try:
-            return True
+            import simpeg.electromagnetics.time_domain as tdem
         except ImportError:
             return False
 
+        self._tdem = tdem
+        return True
+
+    def _check_numba(self):
+        """检查是否安装了Numba，安装时保存内核模块供各分段波形复用."""
+        self._kernels = None
+        try:
+            import waveform_kernels
+        except ImportError:
+            return False
+
+        self._kernels = waveform_kernels
+        return True
+
+    def _kernel(self, name, t):
+        """返回可用于时间向量的Numba内核，不可用时返回None."""
+        if not self.has_numba:
+            return None
+        # 内核只针对单精度和双精度一维数组编译，其余输入仍走NumPy实现
+        if (
+            not isinstance(t, np.ndarray)
+            or t.ndim != 1
+            or t.dtype not in (np.float32, np.float64)
+        ):
+            return None
+
+        return getattr(self._kernels, name)
+
+    def _support(self, t, start_time, end_time):
+        """
+        返回时间向量中落在 [start_time, end_time] 内的采样点索引.
+
+        波形只在这段时间内非零，单调递增的一维 t 用二分查找直接定位连续切片，
+        只需处理切片内的采样点，其余部分保持为0；多维或未排序的 t
+        逐点比较得到布尔掩码.
+
+        参数:
+        t (ndarray): 时间向量
+        start_time (float): 起始时间
+        end_time (float): 结束时间
+
+        返回:
+        slice or ndarray: 单调递增的一维 t 时为索引切片，否则为与 t 同形状的布尔掩码
+        """
+        # 单调性检查只需一次遍历，仍比逐点比较生成掩码更快
+        if t.ndim != 1 or not np.all(t[1:] >= t[:-1]):
+            return (t >= start_time) & (t <= end_time)
+
+        # 浮点边界先转换为 t 的类型，否则单精度 t 会被整体提升为双精度后再查找
+        if t.dtype.kind == "f":
+            start_time = t.dtype.type(start_time)
+            end_time = t.dtype.type(end_time)
+        start = np.searchsorted(t, start_time, side="left")
+        end = np.searchsorted(t, end_time, side="right")
+        return slice(start, end)
+
     def half_sine_wave(self, t, width):
         """
         生成半正弦波.
@@ -51,9 +115,16 @@ class WaveformGenerator:
         返回:
         ndarray: 波形振幅
         """
-        wave = np.zeros_like(t)
-        mask = (0 <= t) & (t <= width)
-        wave[mask] = np.sin(np.pi * t[mask] / width)
+        # 输出为浮点类型，整数时间向量也能得到正确的振幅
+        wave = aligned_zeros(t.shape, np.result_type(t.dtype, np.float32))
+        active = self._support(t, 0, width)
+
+        # 切片时直接在输出数组上原地计算，避免中间临时数组；
+        # 掩码索引得到的是副本，计算后需写回
+        phase = wave[active]
+        np.multiply(t[active], np.pi / width, out=phase)
+        np.sin(phase, out=phase)
+        wave[active] = phase
         return wave
 
     def differential_pulse(self, t, width):
@@ -67,11 +138,41 @@ class WaveformGenerator:
         返回:
         ndarray: 波形振幅
         """
-        wave = np.zeros_like(t)
+        kernel = self._kernel("differential_pulse", t)
+        if kernel is not None:
+            time_delay = self.config["time_delay"]
+            pulse_ratio = self.config["pulse_ratio"]
+
+            # 脉冲在 t6 = 4*time_delay + 2*pulse_time 时结束
+            wave = aligned_zeros(t.shape, t.dtype)
+            active = self._support(t, 0, 4 * time_delay + 2 * width * pulse_ratio)
+            wave[active] = kernel(
+                t[active], width, time_delay, pulse_ratio, wave[active]
+            )
+            return wave
+
+        # 与批量版本共用同一分段表达式
+        return self.differential_pulse_batch(t, [width])[0]
+
+    def differential_pulse_batch(self, t, widths):
+        """
+        批量生成多个波宽的差分脉冲波.
+
+        参数:
+        t (ndarray): 时间向量
+        widths (array_like): 波宽序列，单位秒
+
+        返回:
+        ndarray: 波形振幅，形状为 (len(widths), *t.shape)
+        """
+        t = np.asarray(t)
+        # 时间点与时间向量使用相同的浮点精度，使输出保持输入的 dtype
+        dtype = np.result_type(t.dtype, np.float32)
+        widths = np.asarray(widths, dtype=dtype)[:, np.newaxis]
         time_delay = self.config["time_delay"]
-        pulse_time = width * self.config["pulse_ratio"]
+        pulse_time = widths * self.config["pulse_ratio"]
 
-        # 时间点定义
+        # 时间点定义，t3 之后的时间点随波宽变化，形状为 (len(widths), 1)
         t1 = 0
         t2 = t1 + time_delay
         t3 = t2 + pulse_time
@@ -79,20 +180,25 @@ class WaveformGenerator:
         t5 = t4 + pulse_time
         t6 = t5 + time_delay
 
-        # 使用向量化操作代替循环
-        mask1 = (t1 <= t) & (t < t2)
-        mask2 = (t2 <= t) & (t < t3)
-        mask3 = (t3 <= t) & (t < t4)
-        mask4 = (t4 <= t) & (t < t5)
-        mask5 = (t5 <= t) & (t < t6)
-
-        wave[mask1] = (t[mask1] - t1) / time_delay
-        wave[mask2] = 1.0
-        wave[mask3] = 1.0 - (t[mask3] - t3) / time_delay
-        wave[mask4] = -1.0
-        wave[mask5] = -1.0 * (t6 - t[mask5]) / time_delay
-
-        return wave
+        # 所有波宽的脉冲都在 [t1, max(t6)] 内，只计算这段时间，其余保持为0
+        waves = aligned_zeros((len(widths), *t.shape), dtype)
+        active = self._support(t, t1, np.max(t6))
+        t = t[active][np.newaxis]
+
+        # 通过广播一次性计算所有波宽；np.select 取第一个成立的条件，
+        # 各段只需与右端点比较一次，t1 之前和 t6 之后取默认值0
+        conditions = [t < t1, t < t2, t < t3, t < t4, t < t5, t < t6]
+        choices = [
+            0.0,
+            (t - t1) / time_delay,
+            1.0,
+            1.0 - (t - t3) / time_delay,
+            -1.0,
+            (t - t6) / time_delay,
+        ]
+
+        waves[:, active] = np.select(conditions, choices, default=0.0)
+        return waves
 
     def square_wave(self, t, width):
         """
@@ -105,9 +211,8 @@ class WaveformGenerator:
         返回:
         ndarray: 波形振幅
         """
-        wave = np.zeros_like(t)
-        mask = (0 <= t) & (t <= width)
-        wave[mask] = 1
+        wave = aligned_zeros(t.shape, t.dtype)
+        wave[self._support(t, 0, width)] = 1
         return wave
 
     def triangle_wave(self, t, width):
@@ -121,13 +226,19 @@ class WaveformGenerator:
         返回:
         ndarray: 波形振幅
         """
-        wave = np.zeros_like(t)
-        mask1 = (0 <= t) & (t <= width / 2)
-        mask2 = (width / 2 < t) & (t <= width)
-
-        wave[mask1] = 2 * t[mask1] / width
-        wave[mask2] = 2 - 2 * t[mask2] / width
-
+        # 输出为浮点类型，整数时间向量也能得到正确的振幅
+        wave = aligned_zeros(t.shape, np.result_type(t.dtype, np.float32))
+        active = self._support(t, 0, width)
+
+        kernel = self._kernel("triangle_wave", t)
+        if kernel is not None:
+            wave[active] = kernel(t[active], width, wave[active])
+            return wave
+
+        # 在 [0, width] 内上升沿为 2t/width，下降沿为 2 - 2t/width，取两者较小值
+        ramp = t[active] * (2 / width)
+        np.minimum(ramp, 2 - ramp, out=ramp)
+        wave[active] = ramp
         return wave
 
     def gaussian_pulse(self, t, width):
@@ -145,7 +256,19 @@ class WaveformGenerator:
         center = width / 2
         sigma = width / 6  # 使3sigma约等于半宽
 
-        return np.exp(-((t - center) ** 2) / (2 * sigma**2))
+        # 距中心6sigma之外 exp(-18) < 2e-8，可视为0，只对窗口内的采样点求指数
+        dtype = np.result_type(t.dtype, np.float32)
+        wave = aligned_zeros(t.shape, dtype)
+        mask = np.abs(t - center) < 6 * sigma
+
+        # 在取出的浮点子数组上原地完成平移、平方、缩放和指数运算
+        pulse = t[mask].astype(dtype)
+        pulse -= center
+        np.square(pulse, out=pulse)
+        pulse *= -1 / (2 * sigma**2)
+        np.exp(pulse, out=pulse)
+        wave[mask] = pulse
+        return wave
 
     def simpeg_trapezoid(self, t, width):
         """
@@ -165,14 +288,35 @@ class WaveformGenerator:
         ramp_on = np.array([0, time_delay])
         ramp_off = np.array([width - time_delay, width])
 
+        tdem = self._tdem
         waveform = tdem.sources.TrapezoidWaveform(ramp_on=ramp_on, ramp_off=ramp_off)
 
-        return np.array([waveform.eval(time) for time in t])
+        # 按 TrapezoidWaveform.eval 的分段定义整体向量化计算，代替逐点调用；
+        # np.select 取第一个成立的条件，与 eval 中 if/elif 的顺序一致
+        on_start, on_end = waveform.ramp_on.tolist()
+        off_start, off_end = waveform.ramp_off.tolist()
+        conditions = [
+            t < on_start,
+            t <= on_end,
+            t < off_start,
+            t <= off_end,
+        ]
+        choices = [
+            0.0,
+            (t - on_start) / (on_end - on_start),
+            1.0,
+            1.0 - (t - off_start) / (off_end - off_start),
+        ]
+
+        return np.select(conditions, choices)
 
     def simpeg_differential_pulse(self, t, width):
         """
         生成SimPEG差分脉冲.
 
+        SimPEG 没有差分脉冲波形类，这里用 PiecewiseLinearWaveform 描述：
+        先由 ramp_on/ramp_off 构成正向梯形，再平移一个波宽构成反向梯形.
+
         参数:
         t (ndarray): 时间向量
         width (float): 波宽，单位秒
@@ -186,12 +330,18 @@ class WaveformGenerator:
         time_delay = self.config["time_delay"]
         ramp_on = np.array([0, time_delay])
         ramp_off = np.array([width - time_delay, width])
-
-        waveform = tdem.sources.DifferentialPulseWaveform(
-            ramp_on=ramp_on, ramp_off=ramp_off
+        # 反向梯形的起点与正向梯形的终点重合，节点只保留一次
+        times = np.concatenate(
+            [ramp_on, ramp_off, ramp_on[1:] + width, ramp_off + width]
         )
+        currents = np.array([0.0, 1.0, 1.0, 0.0, -1.0, -1.0, 0.0])
+
+        tdem = self._tdem
+        waveform = tdem.sources.PiecewiseLinearWaveform(times, currents)
 
-        return np.array([waveform.eval(time) for time in t])
+        # 与 PiecewiseLinearWaveform.eval 相同：节点间线性插值，两端之外取端点值
+        wave = np.interp(t, waveform.times, waveform.currents)
+        return wave.astype(np.result_type(np.asarray(t).dtype, np.float32))
 
     def simpeg_step_off(self, t, width):
         """
@@ -207,9 +357,11 @@ class WaveformGenerator:
         if not self.has_simpeg:
             raise ImportError("SimPEG not installed. Please install it first.")
 
+        tdem = self._tdem
         waveform = tdem.sources.StepOffWaveform(off_time=width)
 
-        return np.array([waveform.eval(time) for time in t])
+        # 与 StepOffWaveform.eval 相同：关断时刻（含容差）之前为1，之后为0
+        return np.where(t - waveform.off_time < waveform.epsilon, 1.0, 0.0)
 
     def custom_waveform(self, t, width, func):
         """
@@ -3,12 +3,31 @@
 This module provides functionality for waveform manager.
 """
 
+from collections import ChainMap
+from types import MappingProxyType
+
 import numpy as np
 
+from waveform_utils import aligned_empty
+
 
 class WaveformManager:
     """波形管理器类，整合波形生成、分析和可视化功能."""
 
+    # 默认配置（只读，所有实例共享）
+    _DEFAULTS = MappingProxyType(
+        {
+            "wave_widths": (0.6e-3, 1e-3, 2.5e-3, 5e-3, 10e-3, 20e-3),
+            "time_delay": 1e-5,
+            "t_max": 1.0,
+            "n_samples": 100000,
+            "dtype": np.float32,
+            "fft_workers": -1,
+            "results_dir": "waveform_results",
+            "dpi": 300,
+        }
+    )
+
     def __init__(self, config=None):
         """
         初始化波形管理器.
@@ -16,19 +35,8 @@ class WaveformManager:
         参数:
         config (dict): 配置参数字典
         """
-        # 默认配置
-        default_config = {
-            "wave_widths": [0.6e-3, 1e-3, 2.5e-3, 5e-3, 10e-3, 20e-3],
-            "time_delay": 1e-5,
-            "t_max": 1.0,
-            "n_samples": 100000,
-            "results_dir": "waveform_results",
-        }
-
-        # 更新配置
-        self.config = default_config
-        if config:
-            self.config.update(config)
+        # 用户配置覆盖类级默认配置，默认配置本身不被复制或修改
+        self.config = ChainMap(dict(config or {}), self._DEFAULTS)
 
         # 创建波形生成器
         from waveform_generator import WaveformGenerator
@@ -46,6 +54,8 @@ class WaveformManager:
             {
                 "t_max": self.config["t_max"],
                 "n_samples": self.config["n_samples"],
+                "dtype": self.config["dtype"],
+                "fft_workers": self.config["fft_workers"],
             }
         )
 
@@ -55,10 +65,17 @@ class WaveformManager:
         self.visualizer = WaveformVisualizer(
             {
                 "results_dir": self.config["results_dir"],
+                "dpi": self.config["dpi"],
             }
         )
 
-    def analyze_single_waveform(self, wave_func, width, name, save_data=True):
+    def close(self):
+        """关闭可视化器复用的图形，释放绘图资源."""
+        self.visualizer.close()
+
+    def analyze_single_waveform(
+        self, wave_func, width, name, save_data=True, wave=None, spectrum=None
+    ):
         """
         分析单个波形.
 
@@ -67,23 +84,33 @@ class WaveformManager:
         width (float): 波宽，单位秒
         name (str): 波形名称
         save_data (bool): 是否保存数据
+        wave (ndarray): 预先生成的完整时间轴波形，为None时由wave_func生成
+        spectrum (ndarray): 预先计算的未归一化频谱，为None时由wave计算
 
         返回:
         dict: 分析结果
         """
-        # 生成波形
-        t_full = np.linspace(0, self.config["t_max"], self.config["n_samples"])
-        wave = wave_func(t_full, width)
-
-        # 分析波形
-        spectrum = self.analyzer.compute_spectrum(wave)
-        dominant_freq = self.analyzer.find_dominant_frequency(wave)
-        bandwidth = self.analyzer.compute_bandwidth(wave)
+        # 生成波形，完整时间序列直接复用分析器的时间轴
+        if wave is None:
+            wave = wave_func(self.analyzer.t, width)
+
+        # 分析波形：FFT只计算一次，归一化频谱由未归一化频谱推导后传给各分析方法
+        spectrum_raw = spectrum
+        if spectrum_raw is None:
+            spectrum_raw = self.analyzer.compute_spectrum(wave, normalize=False)
+        peak = np.max(spectrum_raw)
+        spectrum = spectrum_raw / peak if peak > 0 else spectrum_raw
+        dominant_freq = self.analyzer.find_dominant_frequency(
+            wave, spectrum=spectrum_raw
+        )
+        bandwidth = self.analyzer.compute_bandwidth(wave, spectrum=spectrum)
         stats = self.analyzer.compute_statistics(wave)
-        peaks = self.analyzer.find_multiple_peaks(wave)
+        peaks = self.analyzer.find_multiple_peaks(wave, spectrum=spectrum)
+        # 绘图和导出共用同一个去掉直流分量的频谱视图
+        spectrum_positive = self.analyzer.spectrum_positive(spectrum=spectrum)
 
         # 可视化
-        t_display = np.linspace(0, width * 3, 10000)
+        t_display = np.linspace(0, width * 3, 10000, dtype=self.config["dtype"])
         wave_display = wave_func(t_display, width)
 
         # 保存结果
@@ -101,7 +128,7 @@ class WaveformManager:
             t_display,
             wave_display,
             self.analyzer.freq_positive,
-            spectrum[1 : len(self.analyzer.freq_positive) + 1],
+            spectrum_positive,
             width,
             f"{name} (Width: {width*1e3:.1f}ms)",
             f"{name.replace(' ', '_')}_{width*1e3:.1f}ms_analysis.png",
@@ -119,7 +146,7 @@ class WaveformManager:
                 t_display,
                 wave_display,
                 self.analyzer.freq_positive,
-                spectrum[1 : len(self.analyzer.freq_positive) + 1],
+                spectrum_positive,
                 f"{name.replace(' ', '_')}_{width*1e3:.1f}ms",
             )
 
@@ -156,28 +183,40 @@ class WaveformManager:
         返回:
         dict: 比较结果
         """
-        t_display = np.linspace(0, width * 3, 10000)
+        t_display = np.linspace(0, width * 3, 10000, dtype=self.config["dtype"])
         waves = []
-        spectra = []
+        waves_full = aligned_empty(
+            (len(wave_funcs), self.config["n_samples"]), dtype=self.config["dtype"]
+        )
         results = []
 
-        for wave_func, name in zip(wave_funcs, names):
-            # 生成波形
+        # 完整时间轴上的波形只生成一次，所有波形的频谱通过一次批量 rfft 计算，
+        # 逐个分析时直接复用，不再重复生成波形和计算FFT
+        for i, wave_func in enumerate(wave_funcs):
+            waves_full[i] = wave_func(self.analyzer.t, width)
+        spectra = self.analyzer.compute_spectrum_batch(waves_full, normalize=False)
+
+        for i, (wave_func, name) in enumerate(zip(wave_funcs, names)):
+            # 生成显示用波形
             wave = wave_func(t_display, width)
             waves.append(wave)
 
-            # 分析波形
-            t_full = np.linspace(0, self.config["t_max"], self.config["n_samples"])
-            wave_full = wave_func(t_full, width)
-            spectrum = self.analyzer.compute_spectrum(wave_full)
-            spectra.append(spectrum[1 : len(self.analyzer.freq_positive) + 1])
-
             # 收集结果
             result = self.analyze_single_waveform(
-                wave_func, width, name, save_data=False
+                wave_func,
+                width,
+                name,
+                save_data=False,
+                wave=waves_full[i],
+                spectrum=spectra[i],
             )
             results.append(result)
 
+        # 分析完成后逐个波形原地归一化频谱，用于比较绘图
+        peak = np.max(spectra, axis=-1, keepdims=True)
+        np.divide(spectra, peak, out=spectra, where=peak > 0)
+        spectra = self.analyzer.spectrum_positive(spectrum=spectra)
+
         # 可视化波形比较
         self.visualizer.plot_multiple_waveforms(
             t_display,
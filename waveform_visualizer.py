@@ -4,49 +4,57 @@ This module provides functionality for waveform visualizer.
 """
 
 import os
+from collections import ChainMap
+from datetime import datetime
+from types import MappingProxyType
 
-import matplotlib.pyplot as plt
-import numpy as np
-import pandas as pd
+import matplotlib
+
+# 所有图像都直接保存到文件，使用非交互式的Agg后端，无需初始化图形界面
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+from matplotlib.figure import Figure  # noqa: E402
 
 
 class WaveformVisualizer:
     """波形可视化器类，用于可视化和保存波形分析结果."""
 
-    def __init__(self, config=None):
-        """
-        初始化波形可视化器.
-
-        参数:
-        config (dict): 配置参数字典，可包含以下键:
-            - colors: 绘图颜色列表
-            - results_dir: 结果保存目录
-            - dpi: 图像DPI
-            - figsize_time: 时域图尺寸
-            - figsize_freq: 频域图尺寸
-            - figsize_compare: 比较图尺寸
-        """
-        # 默认配置
-        default_config = {
-            "colors": [
+    # 默认配置（只读，所有实例共享）
+    _DEFAULTS = MappingProxyType(
+        {
+            "colors": (
                 "#FF6666",
                 "#FF9966",
                 "#FFCC66",
                 "#99CCFF",
                 "#3399FF",
                 "#666699",
-            ],
+            ),
             "results_dir": "waveform_results",
             "dpi": 300,
             "figsize_time": (10, 6),
             "figsize_freq": (10, 6),
             "figsize_compare": (12, 10),
         }
+    )
 
-        # 更新配置
-        self.config = default_config
-        if config:
-            self.config.update(config)
+    def __init__(self, config=None):
+        """
+        初始化波形可视化器.
+
+        参数:
+        config (dict): 配置参数字典，可包含以下键:
+            - colors: 绘图颜色列表
+            - results_dir: 结果保存目录
+            - dpi: 图像DPI
+            - figsize_time: 时域图尺寸
+            - figsize_freq: 频域图尺寸
+            - figsize_compare: 比较图尺寸
+        """
+        # 用户配置覆盖类级默认配置，默认配置本身不被复制或修改
+        self.config = ChainMap(dict(config or {}), self._DEFAULTS)
 
         # 创建结果保存目录
         if not os.path.exists(self.config["results_dir"]):
@@ -58,6 +66,37 @@ class WaveformVisualizer:
         plt.rcParams["mathtext.fontset"] = "stix"
         plt.rcParams["axes.unicode_minus"] = True
 
+        # 每种绘图类型复用一个图形及其坐标轴，避免每次绘图重复创建图形；
+        # 图形不经 pyplot 创建，不受全局图形管理器持有，随可视化器一起释放
+        self._figures = {}
+
+    def _get_figure(self, key, figsize, nrows=1):
+        """
+        获取指定绘图类型复用的图形和坐标轴，首次使用时创建.
+
+        参数:
+        key (str): 绘图类型
+        figsize (tuple): 图形尺寸
+        nrows (int): 子图行数
+
+        返回:
+        tuple: (图形, 坐标轴数组)，坐标轴已清空
+        """
+        if key not in self._figures:
+            fig = Figure(figsize=figsize)
+            axes = fig.subplots(nrows, 1)
+            self._figures[key] = (fig, np.atleast_1d(axes))
+
+        fig, axes = self._figures[key]
+        for ax in axes:
+            ax.clear()
+
+        return fig, axes
+
+    def close(self):
+        """释放所有复用的图形，可选调用，可视化器被回收时图形也会一并释放."""
+        self._figures.clear()
+
     def plot_waveform(self, t, wave, width, title, filename, xlim=None, ylim=None):
         """
         绘制单个波形.
@@ -71,27 +110,26 @@ class WaveformVisualizer:
         xlim (tuple): x轴范围
         ylim (tuple): y轴范围
         """
-        plt.figure(figsize=self.config["figsize_time"])
-        plt.plot(t * 1e3, wave, "r-", linewidth=2)
-        plt.axhline(y=0, color="k", linestyle="-", linewidth=0.8)
+        fig, (ax,) = self._get_figure("waveform", self.config["figsize_time"])
+        ax.plot(t * 1e3, wave, "r-", linewidth=2)
+        ax.axhline(y=0, color="k", linestyle="-", linewidth=0.8)
 
         if xlim is None:
-            plt.xlim([0, width * 3 * 1e3])  # 默认显示3倍波宽
+            ax.set_xlim([0, width * 3 * 1e3])  # 默认显示3倍波宽
         else:
-            plt.xlim(xlim)
+            ax.set_xlim(xlim)
 
         if ylim is not None:
-            plt.ylim(ylim)
+            ax.set_ylim(ylim)
 
-        plt.xlabel("Time (ms)")
-        plt.ylabel("Amplitude")
-        plt.title(title)
-        plt.grid(True, alpha=0.3)
-        plt.tight_layout()
+        ax.set_xlabel("Time (ms)")
+        ax.set_ylabel("Amplitude")
+        ax.set_title(title)
+        ax.grid(True, alpha=0.3)
+        fig.tight_layout()
 
         save_path = os.path.join(self.config["results_dir"], filename)
-        plt.savefig(save_path, dpi=self.config["dpi"])
-        plt.close()
+        fig.savefig(save_path, dpi=self.config["dpi"])
 
         return save_path
 
@@ -110,26 +148,25 @@ class WaveformVisualizer:
         Returns:
             str: 保存的文件路径
         """
-        plt.figure(figsize=(10, 6))
+        fig, (ax,) = self._get_figure("spectrum", self.config["figsize_freq"])
 
         # 确保频率和频谱数组长度一致
         min_len = min(len(freq), len(spectrum))
         freq = freq[:min_len]
         spectrum = spectrum[:min_len]
 
-        plt.semilogx(freq, spectrum, "b-", linewidth=2)
-        plt.grid(True, which="both", ls="--", alpha=0.7)
-        plt.xlabel("Frequency (Hz)")
-        plt.ylabel("Amplitude")
-        plt.title(title)
+        ax.semilogx(freq, spectrum, "b-", linewidth=2)
+        ax.grid(True, which="both", ls="--", alpha=0.7)
+        ax.set_xlabel("Frequency (Hz)")
+        ax.set_ylabel("Amplitude")
+        ax.set_title(title)
 
         # 设置x轴的范围和刻度
         if len(freq) > 0:
-            plt.xlim(freq[1], freq[-1])  # 从第二个点开始，避免log(0)
+            ax.set_xlim(freq[1], freq[-1])  # 从第二个点开始，避免log(0)
 
         save_path = os.path.join(self.results_dir, filename)
-        plt.savefig(save_path, dpi=300, bbox_inches="tight")
-        plt.close()
+        fig.savefig(save_path, dpi=self.config["dpi"], bbox_inches="tight")
 
         return save_path
 
@@ -160,7 +197,7 @@ class WaveformVisualizer:
         Returns:
             str: 保存的文件路径
         """
-        fig, axes = plt.subplots(2, 1, figsize=(10, 10))
+        fig, axes = self._get_figure("waveform_and_spectrum", (10, 10), nrows=2)
 
         # 绘制波形
         axes[0].plot(t, wave, "r-", linewidth=2)
@@ -209,12 +246,11 @@ class WaveformVisualizer:
         if len(freq_plot) > 0:
             axes[1].set_xlim(freq_plot[1], freq_plot[-1])  # 从第二个点开始，避免log(0)
 
-        plt.suptitle(title, fontsize=16)
-        plt.tight_layout()
+        fig.suptitle(title, fontsize=16)
+        fig.tight_layout()
 
         save_path = os.path.join(self.results_dir, filename)
-        plt.savefig(save_path, dpi=300, bbox_inches="tight")
-        plt.close()
+        fig.savefig(save_path, dpi=self.config["dpi"], bbox_inches="tight")
 
         return save_path
 
@@ -234,13 +270,17 @@ class WaveformVisualizer:
         Returns:
             tuple: (时域文件路径, 频域文件路径)
         """
-        import pandas as pd
+        # 纯数值的两列数据直接用 np.savetxt 写出，无需构造 DataFrame
+        csv_options = {"delimiter": ",", "comments": "", "fmt": "%.7e"}
 
         # 导出时域数据
-        time_data = pd.DataFrame({"Time (s)": t, "Amplitude": wave})
-
         time_file = os.path.join(self.results_dir, f"{filename_base}_time.csv")
-        time_data.to_csv(time_file, index=False)
+        np.savetxt(
+            time_file,
+            np.column_stack([t, wave]),
+            header="Time (s),Amplitude",
+            **csv_options,
+        )
 
         # 确保频率和频谱数组长度一致
         min_len = min(len(freq), len(spectrum))
@@ -248,12 +288,13 @@ class WaveformVisualizer:
         spectrum_export = spectrum[:min_len]
 
         # 导出频域数据
-        freq_data = pd.DataFrame(
-            {"Frequency (Hz)": freq_export, "Amplitude": spectrum_export}
-        )
-
         freq_file = os.path.join(self.results_dir, f"{filename_base}_freq.csv")
-        freq_data.to_csv(freq_file, index=False)
+        np.savetxt(
+            freq_file,
+            np.column_stack([freq_export, spectrum_export]),
+            header="Frequency (Hz),Amplitude",
+            **csv_options,
+        )
 
         return time_file, freq_file
 
@@ -273,11 +314,13 @@ class WaveformVisualizer:
         xlim (tuple): x轴范围
         ylim (tuple): y轴范围
         """
-        plt.figure(figsize=self.config["figsize_compare"])
+        fig, (ax,) = self._get_figure(
+            "multiple_waveforms", self.config["figsize_compare"]
+        )
 
         for i, (wave, width, label) in enumerate(zip(waves, widths, labels)):
             color_idx = i % len(self.config["colors"])
-            plt.plot(
+            ax.plot(
                 t * 1e3,
                 wave,
                 color=self.config["colors"][color_idx],
@@ -285,28 +328,27 @@ class WaveformVisualizer:
                 linewidth=2,
             )
 
-        plt.axhline(y=0, color="k", linestyle="-", linewidth=0.8)
+        ax.axhline(y=0, color="k", linestyle="-", linewidth=0.8)
 
         if xlim is None:
-            plt.xlim([0, max(widths) * 3 * 1e3])  # 默认显示3倍最大波宽
+            ax.set_xlim([0, max(widths) * 3 * 1e3])  # 默认显示3倍最大波宽
         else:
-            plt.xlim(xlim)
+            ax.set_xlim(xlim)
 
         if ylim is not None:
-            plt.ylim(ylim)
+            ax.set_ylim(ylim)
         else:
-            plt.ylim([-1.1, 1.1])
+            ax.set_ylim([-1.1, 1.1])
 
-        plt.xlabel("Time (ms)")
-        plt.ylabel("Amplitude")
-        plt.title(title)
-        plt.legend()
-        plt.grid(True, alpha=0.3)
-        plt.tight_layout()
+        ax.set_xlabel("Time (ms)")
+        ax.set_ylabel("Amplitude")
+        ax.set_title(title)
+        ax.legend()
+        ax.grid(True, alpha=0.3)
+        fig.tight_layout()
 
         save_path = os.path.join(self.config["results_dir"], filename)
-        plt.savefig(save_path, dpi=self.config["dpi"])
-        plt.close()
+        fig.savefig(save_path, dpi=self.config["dpi"])
 
         return save_path
 
@@ -325,11 +367,13 @@ class WaveformVisualizer:
         xlim (tuple): x轴范围
         ylim (tuple): y轴范围
         """
-        plt.figure(figsize=self.config["figsize_compare"])
+        fig, (ax,) = self._get_figure(
+            "multiple_spectra", self.config["figsize_compare"]
+        )
 
         for i, (spectrum, label) in enumerate(zip(spectra, labels)):
             color_idx = i % len(self.config["colors"])
-            plt.semilogx(
+            ax.semilogx(
                 freq,
                 spectrum,
                 color=self.config["colors"][color_idx],
@@ -338,25 +382,24 @@ class WaveformVisualizer:
             )
 
         if xlim is None:
-            plt.xlim([1, 1e5])  # 默认频率范围
+            ax.set_xlim([1, 1e5])  # 默认频率范围
         else:
-            plt.xlim(xlim)
+            ax.set_xlim(xlim)
 
         if ylim is not None:
-            plt.ylim(ylim)
+            ax.set_ylim(ylim)
         else:
-            plt.ylim([0, 1.05])
+            ax.set_ylim([0, 1.05])
 
-        plt.xlabel("Frequency (Hz)")
-        plt.ylabel("Normalized Amplitude")
-        plt.title(title)
-        plt.legend()
-        plt.grid(True, which="both", linestyle="--", alpha=0.3)
-        plt.tight_layout()
+        ax.set_xlabel("Frequency (Hz)")
+        ax.set_ylabel("Normalized Amplitude")
+        ax.set_title(title)
+        ax.legend()
+        ax.grid(True, which="both", linestyle="--", alpha=0.3)
+        fig.tight_layout()
 
         save_path = os.path.join(self.config["results_dir"], filename)
-        plt.savefig(save_path, dpi=self.config["dpi"])
-        plt.close()
+        fig.savefig(save_path, dpi=self.config["dpi"])
 
         return save_path
 
@@ -411,6 +454,6 @@ class WaveformVisualizer:
                 ):
                     f.write(f"  峰值 {i+1}: {freq:.2f} Hz (幅值: {val:.6f})\n")
 
-            f.write(f"\n生成时间: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+            f.write(f"\n生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
 
         return report_path